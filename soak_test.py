@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import voice_translator
+from voice_translator import (
+    Config,
+    SentenceManager,
+    VoiceTranslator,
+    WebSocketClient,
+    current_rss_bytes,
+)
+
+# 합성 발화에 사용할 문장 조각
+SUBJECTS = ["오늘 회의는", "이번 프로젝트는", "저희 팀은", "새로운 기능은", "고객 문의는", "배포 일정은"]
+PREDICATES = ["예정대로 진행됩니다", "조금 늦어질 것 같아요", "다음 주에 마무리할 예정입니다",
+              "검토가 더 필요합니다", "잘 되고 있나요?", "어떻게 생각하세요?", "그리고", "그래서 결국"]
+
+
+class LocalTranslateClient:
+    """AWS Translate를 대신하는 로컬 번역 클라이언트"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def translate_text(self, Text, SourceLanguageCode, TargetLanguageCode):
+        if self.delay:
+            time.sleep(self.delay)
+        return {'TranslatedText': f"[{TargetLanguageCode}] {Text}"}
+
+
+class LocalWebSocketClient(WebSocketClient):
+    """실제 서버 대신 전송된 메시지 수만 기록하는 WebSocket 클라이언트"""
+
+    def __init__(self, fail=False):
+        super().__init__("ws://localhost")
+        self.connected = True
+        self.fail = fail
+        self.sent = 0
+
+    def send_message(self, sender, message, translation):
+        if self.fail:
+            raise Exception("WebSocket이 연결되어 있지 않습니다.")
+        self.sent += 1
+
+    def close(self):
+        self.connected = False
+
+
+class LocalOpenAI:
+    """OpenAI 문장 완성 API를 대신하는 로컬 구현"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        text = messages[-1]['content'].rsplit("현재 텍스트: ", 1)[-1]
+        is_complete = text.endswith(("다", "요", "?"))
+        content = json.dumps({'is_complete': is_complete, 'sentence': text if is_complete else ""})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def transcript_event(text, is_partial):
+    """Transcribe 스트리밍 이벤트와 같은 구조의 합성 이벤트를 생성합니다."""
+    result = SimpleNamespace(is_partial=is_partial, alternatives=[SimpleNamespace(transcript=text)])
+    return SimpleNamespace(transcript=SimpleNamespace(results=[result]))
+
+
+def build_translator(config, translate_client, ws_client):
+    """마이크, AWS, WebSocket 연결 없이 로컬 대체 구현으로 번역기를 구성하고 시작합니다."""
+    # 마이크 선택과 외부 연결을 수행하는 __init__ 대신 파이프라인 설정만 사용
+    translator = VoiceTranslator.__new__(VoiceTranslator)
+    translator.setup_pipeline(config, translate_client, ws_client)
+    translator.start_pipeline(None)
+    return translator
+
+
+def wait_for(q, timeout):
+    """큐의 모든 항목이 처리될 때까지 기다리고, 제한 시간 안에 끝났는지 반환합니다."""
+    waiter = threading.Thread(target=q.join, daemon=True)
+    waiter.start()
+    waiter.join(timeout)
+    return not waiter.is_alive()
+
+
+def test_put_bounded_drops_oldest():
+    """가득 찬 큐는 가장 오래된 항목을 버리고, 버린 항목도 처리 완료로 계산해야 합니다."""
+    config = Config()
+    config.QUEUE_SIZE = 2
+    sentence_manager = SentenceManager(config)
+    for item in ("첫째", "둘째", "셋째"):
+        sentence_manager.put_bounded('correction_queue', item)
+
+    q = sentence_manager.correction_queue
+    assert sentence_manager.dropped['correction_queue'] == 1
+    assert sentence_manager.dropped['translation_queue'] == 0
+    assert q.qsize() == 2
+    assert [q.get_nowait(), q.get_nowait()] == ["둘째", "셋째"]
+    assert q.unfinished_tasks == 2
+    q.task_done()
+    q.task_done()
+    assert wait_for(q, 1)
+
+    # 버린 항목은 오류 기록에도 남아야 함
+    report = sentence_manager.stats.snapshot()
+    assert report['errors'] == {'correction_queue': 1}, report['errors']
+    assert "누적 1개" in report['recent_errors'][-1]['message']
+
+
+def test_worker_errors_do_not_block_join():
+    """워커에서 오류가 발생해도 task_done()이 호출되어 join()이 끝나야 합니다."""
+    config = Config()
+    original_openai = voice_translator.openai
+    voice_translator.openai = LocalOpenAI()
+    translator = build_translator(config, LocalTranslateClient(), LocalWebSocketClient(fail=True))
+    sentence_manager = translator.handler.sentence_manager
+    try:
+        # 번역 스레드: WebSocket 전송 실패
+        sentence_manager.put_bounded('translation_queue', ("전송에 실패할 문장입니다", time.time()))
+        assert wait_for(sentence_manager.translation_queue, 5)
+
+        # 교정 스레드: 문장 완성 확인 중 예외
+        def fail(text):
+            raise ValueError("교정 실패")
+        sentence_manager.add_text = fail
+        sentence_manager.put_bounded('correction_queue', ("교정에 실패할 문장입니다", time.time()))
+        assert wait_for(sentence_manager.correction_queue, 5)
+
+        errors = translator.stats.snapshot()['errors']
+        assert errors == {'translation': 1, 'correction': 1}, errors
+        assert translator.correction_thread.is_alive() and translator.translation_thread.is_alive()
+    finally:
+        translator.stop_pipeline()
+        voice_translator.openai = original_openai
+
+
+CHECKS = [test_put_bounded_drops_oldest, test_worker_errors_do_not_block_join]
+
+
+def check_buffers(report):
+    """용량이 없거나 용량을 초과한 버퍼 이름을 반환합니다. (느슨한 제한은 제외)"""
+    return [
+        name for name, info in report['buffers'].items()
+        if 'soft_limit' not in info and (not info.get('capacity') or info['size'] > info['capacity'])
+    ]
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+class Soak:
+    """일반 발화, 부분 결과만 이어지는 긴 발화, 처리량을 넘는 폭주 구간을 반복 실행합니다."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.interval = args.event_interval / args.speed
+        self.simulated = 0.0
+        self.last_sentences = 0
+        self.samples = []  # 일반 구간의 RSS 및 지연 시간 측정값
+        self.phases = []  # 긴 발화 및 폭주 구간의 측정값
+
+        config = Config()
+        self.original_openai = voice_translator.openai
+        voice_translator.openai = LocalOpenAI(args.openai_delay / args.speed)
+        self.translator = build_translator(
+            config, LocalTranslateClient(args.translate_delay / args.speed), LocalWebSocketClient())
+        self.handler = self.translator.handler
+        self.sentence_manager = self.handler.sentence_manager
+
+        # 시간 기반 설정을 가속 배율에 맞게 축소
+        self.sentence_manager.min_sentence_interval /= args.speed
+        self.sentence_manager.max_wait_time /= args.speed
+
+    def close(self):
+        """스레드를 종료하고 교체한 OpenAI 모듈을 복원합니다."""
+        self.translator.stop_pipeline()
+        voice_translator.openai = self.original_openai
+
+    def utterance(self):
+        return f"{self.rng.choice(SUBJECTS)} {self.rng.choice(PREDICATES)}".split()
+
+    async def event(self, text, is_partial, interval=None):
+        await self.handler.handle_transcript_event(transcript_event(text, is_partial))
+        await asyncio.sleep(self.interval if interval is None else interval)
+        self.simulated += self.args.event_interval if interval is None else interval * self.args.speed
+
+    def mark(self):
+        """이후 측정에서 제외할 문장 수를 기록합니다."""
+        _, self.last_sentences = self.translator.stats.latencies_since(self.last_sentences)
+
+    def checkpoint(self):
+        report = self.translator.memory_report()
+        window, sentences = self.translator.stats.latencies_since(self.last_sentences)
+        new = sentences - self.last_sentences
+        self.last_sentences = sentences
+        latency = median(window)
+        self.samples.append({
+            'simulated_minutes': self.simulated / 60,
+            'rss_bytes': current_rss_bytes(),
+            'sentences': new,
+            # 지연 시간은 시뮬레이션 초 단위로 환산
+            'latency_p50': latency * self.args.speed if latency is not None else None,
+            'overflowing': check_buffers(report),
+        })
+
+    async def normal(self, seconds):
+        """단어마다 부분 결과를 보내고 마지막에 최종 결과를 보내는 일반 발화 구간"""
+        end = self.simulated + seconds
+        next_checkpoint = self.simulated + self.args.checkpoint_minutes * 60
+        while self.simulated < end:
+            words = self.utterance()
+            for i in range(1, len(words) + 1):
+                for _ in range(self.args.partials_per_word):
+                    await self.event(" ".join(words[:i]), True)
+            await self.event(" ".join(words), False)
+            if self.simulated >= next_checkpoint:
+                self.checkpoint()
+                next_checkpoint += self.args.checkpoint_minutes * 60
+
+    async def monologue(self):
+        """최종 결과 없이 부분 결과만 계속 늘어나는 긴 발화 구간"""
+        words = []
+        for i in range(self.args.monologue_events):
+            if i % self.args.partials_per_word == 0:
+                words += self.utterance()
+            await self.event(" ".join(words), True)
+        # 최종 결과 도착 전에 부분 결과 버퍼와 RSS 측정
+        report = self.translator.memory_report()
+        self.phases.append({
+            'phase': 'monologue',
+            'simulated_minutes': self.simulated / 60,
+            'rss_bytes': current_rss_bytes(),
+            # 직전 일반 구간의 RSS와 비교해 긴 발화가 메모리를 늘리지 않는지 확인
+            'normal_rss_bytes': self.samples[-1]['rss_bytes'] if self.samples else None,
+            'partial_results': report['buffers']['partial_results']['size'],
+            'partial_chars': report['buffers']['partial_results']['chars'],
+            'overflowing': check_buffers(report),
+        })
+        await self.event(" ".join(words[-10:]), False)
+
+    async def burst(self):
+        """교정 스레드의 처리량보다 빠르게 최종 결과를 보내 큐가 가득 차는 구간"""
+        dropped = sum(self.sentence_manager.dropped.values())
+        drop_errors = self.drop_errors()
+        peak = 0
+        for _ in range(self.args.burst_events):
+            await self.event(" ".join(self.utterance()), False, self.args.burst_interval / self.args.speed)
+            peak = max(peak, self.sentence_manager.correction_queue.qsize())
+        report = self.translator.memory_report()
+        self.phases.append({
+            'phase': 'burst',
+            'simulated_minutes': self.simulated / 60,
+            'rss_bytes': current_rss_bytes(),
+            'peak_queue': peak,
+            'dropped': sum(self.sentence_manager.dropped.values()) - dropped,
+            'drop_errors': self.drop_errors() - drop_errors,
+            'overflowing': check_buffers(report),
+        })
+        # 밀린 문장을 모두 처리한 뒤 다음 구간의 지연 시간 측정 시작
+        await asyncio.to_thread(self.sentence_manager.correction_queue.join)
+        await asyncio.to_thread(self.sentence_manager.translation_queue.join)
+        self.mark()
+
+    def drop_errors(self):
+        """큐 항목 버림으로 기록된 오류 수를 반환합니다."""
+        errors = self.translator.stats.snapshot()['errors']
+        return sum(errors.get(name, 0) for name in self.sentence_manager.dropped)
+
+    async def run(self):
+        total = self.args.hours * 3600
+        while self.simulated < total:
+            await self.normal(self.args.cycle_minutes * 60)
+            await self.monologue()
+            await self.burst()
+
+    def evaluate(self):
+        """RSS, 지연 시간, 버퍼 상태를 검사하고 실패 사유 목록을 반환합니다."""
+        args = self.args
+        failures = []
+        if len(self.samples) < 2:
+            return ["체크포인트가 부족합니다. --hours 또는 --checkpoint-minutes 값을 조정하세요."]
+
+        # 워밍업 구간 이후의 RSS 증가량을 같은 종류의 구간끼리 비교
+        warmup_minutes = args.hours * 60 * args.warmup
+        if any(s['rss_bytes'] is None for s in self.samples + self.phases):
+            failures.append("현재 RSS를 측정할 수 없는 환경입니다 (최대 RSS는 비교에 사용하지 않음)")
+        series = {'normal': self.samples}
+        for phase in self.phases:
+            series.setdefault(phase['phase'], []).append(phase)
+        for name, samples in series.items():
+            rss = [s['rss_bytes'] for s in samples
+                   if s['simulated_minutes'] > warmup_minutes and s['rss_bytes'] is not None]
+            if rss:
+                growth_mb = (max(rss) - rss[0]) / (1024 * 1024)
+                if growth_mb > args.rss_tolerance_mb:
+                    failures.append(f"{name} 구간의 RSS가 {growth_mb:.1f}MB 증가했습니다 "
+                                    f"(허용치 {args.rss_tolerance_mb}MB)")
+
+        # 처음과 마지막 일반 구간의 문장 지연 시간 비교
+        latencies = [s['latency_p50'] for s in self.samples
+                     if s['simulated_minutes'] > warmup_minutes and s['latency_p50'] is not None]
+        if len(latencies) >= 2:
+            first, last = latencies[0], latencies[-1]
+            if last > first * args.latency_factor:
+                failures.append(f"문장 지연 시간이 {first:.2f}초에서 {last:.2f}초로 증가했습니다 "
+                                f"(허용 배율 {args.latency_factor})")
+        else:
+            failures.append("지연 시간 측정값이 부족합니다")
+
+        # 긴 발화 구간의 RSS가 직전 일반 구간과 비슷한지 확인
+        for phase in self.phases:
+            if phase['phase'] == 'monologue' and None not in (phase['rss_bytes'], phase['normal_rss_bytes']):
+                over_mb = (phase['rss_bytes'] - phase['normal_rss_bytes']) / (1024 * 1024)
+                if over_mb > args.monologue_rss_tolerance_mb:
+                    failures.append(f"{phase['simulated_minutes']:.0f}분: 긴 발화 구간의 RSS가 일반 구간보다 "
+                                    f"{over_mb:.1f}MB 높습니다 (허용치 {args.monologue_rss_tolerance_mb}MB)")
+
+        for sample in self.samples + self.phases:
+            if sample['overflowing']:
+                failures.append(f"{sample['simulated_minutes']:.0f}분: 버퍼 용량 초과 또는 무제한 {sample['overflowing']}")
+
+        # 폭주 구간이 실제로 큐를 가득 채우지 못했다면 제한 검사가 의미 없음
+        for phase in self.phases:
+            if phase['phase'] == 'burst' and not phase['dropped']:
+                failures.append(f"{phase['simulated_minutes']:.0f}분: 폭주 구간에서 큐가 가득 차지 않았습니다")
+            if phase['phase'] == 'burst' and phase['dropped'] and not phase['drop_errors']:
+                failures.append(f"{phase['simulated_minutes']:.0f}분: 버린 문장이 오류로 기록되지 않았습니다")
+
+        # 폭주 구간의 큐 항목 버림은 예상된 기록이므로 제외
+        errors = {source: count for source, count in self.translator.stats.snapshot()['errors'].items()
+                  if source not in self.sentence_manager.dropped}
+        if errors:
+            failures.append(f"파이프라인 오류 발생: {errors}")
+        return failures
+
+
+def run_checks(verbose=False):
+    failures = []
+    for check in CHECKS:
+        try:
+            with contextlib.redirect_stdout(sys.stdout if verbose else open(os.devnull, 'w')) as output:
+                try:
+                    check()
+                finally:
+                    if output is not sys.stdout:
+                        output.close()
+            print(f"통과: {check.__name__}")
+        except AssertionError as e:
+            failures.append(f"{check.__name__} {e}")
+    return failures
+
+
+def run_soak(args):
+    soak = Soak(args)
+    output = sys.stdout if args.verbose else open(os.devnull, 'w')
+    started = time.time()
+    try:
+        with contextlib.redirect_stdout(output):
+            asyncio.run(soak.run())
+            # 남은 문장이 모두 처리될 때까지 대기
+            soak.sentence_manager.correction_queue.join()
+            soak.sentence_manager.translation_queue.join()
+    finally:
+        soak.close()
+        if output is not sys.stdout:
+            output.close()
+    return soak, time.time() - started
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="합성 음성 인식 이벤트로 번역 파이프라인의 장시간 안정성을 검사합니다.")
+    parser.add_argument('--hours', type=float, default=8, help="시뮬레이션할 실행 시간 (시간)")
+    parser.add_argument('--speed', type=float, default=240, help="실제 시간 대비 가속 배율")
+    parser.add_argument('--event-interval', type=float, default=0.3, help="이벤트 간격 (시뮬레이션 초)")
+    parser.add_argument('--partials-per-word', type=int, default=2, help="단어마다 전달할 부분 결과 수")
+    parser.add_argument('--cycle-minutes', type=float, default=60,
+                        help="긴 발화 및 폭주 구간 사이의 일반 발화 구간 길이 (시뮬레이션 분)")
+    parser.add_argument('--checkpoint-minutes', type=float, default=15, help="일반 구간 측정 간격 (시뮬레이션 분)")
+    parser.add_argument('--monologue-events', type=int, default=3000, help="긴 발화 구간의 부분 결과 수")
+    parser.add_argument('--burst-events', type=int, default=1000, help="폭주 구간의 최종 결과 수")
+    parser.add_argument('--burst-interval', type=float, default=0.15, help="폭주 구간의 이벤트 간격 (시뮬레이션 초)")
+    parser.add_argument('--translate-delay', type=float, default=0.2, help="로컬 번역 응답 지연 (시뮬레이션 초)")
+    parser.add_argument('--openai-delay', type=float, default=0.5, help="로컬 문장 완성 응답 지연 (시뮬레이션 초)")
+    parser.add_argument('--warmup', type=float, default=0.1, help="측정에서 제외할 초기 구간 비율")
+    parser.add_argument('--rss-tolerance-mb', type=float, default=2, help="워밍업 이후 허용되는 RSS 증가량")
+    parser.add_argument('--monologue-rss-tolerance-mb', type=float, default=1,
+                        help="직전 일반 구간 대비 긴 발화 구간에서 허용되는 RSS 증가량")
+    parser.add_argument('--latency-factor', type=float, default=1.25, help="허용되는 지연 시간 증가 배율")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checks-only', action='store_true', help="큐 처리 검사만 실행합니다")
+    parser.add_argument('--verbose', action='store_true', help="파이프라인 출력을 표시합니다")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    failures = run_checks(args.verbose)
+    if failures or args.checks_only:
+        for failure in failures:
+            print(f"실패: {failure}")
+        return 1 if failures else 0
+
+    print(f"소크 테스트 시작: {args.hours}시간 분량, {args.speed}배속")
+    soak, elapsed = run_soak(args)
+
+    for sample in soak.samples:
+        rss = sample['rss_bytes']
+        latency = sample['latency_p50']
+        print(f"{sample['simulated_minutes']:6.0f}분 | "
+              f"RSS {rss / (1024 * 1024) if rss else 0:7.1f}MB | "
+              f"문장 {sample['sentences']:5d} | "
+              f"지연 p50 {latency if latency is not None else 0:6.2f}초")
+    for phase in soak.phases:
+        rss = phase['rss_bytes']
+        detail = (f"부분 결과 {phase['partial_results']}개 ({phase['partial_chars']}자)" if phase['phase'] == 'monologue'
+                  else f"최대 큐 {phase['peak_queue']}, 버림 {phase['dropped']} (오류 기록 {phase['drop_errors']}회)")
+        print(f"{phase['simulated_minutes']:6.0f}분 | RSS {rss / (1024 * 1024) if rss else 0:7.1f}MB | "
+              f"{phase['phase']} | {detail}")
+    print(f"메모리 리포트: {json.dumps(soak.translator.memory_report(), ensure_ascii=False)}")
+    print(f"실행 시간: {elapsed:.1f}초")
+
+    failures = soak.evaluate()
+    if failures:
+        for failure in failures:
+            print(f"실패: {failure}")
+        return 1
+    print("소크 테스트 통과")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
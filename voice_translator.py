@@ -1,4 +1,7 @@
 import os
+import sys
+import signal
+import subprocess
 import pyaudio
 import boto3
 import json
@@ -30,12 +33,109 @@ class Config:
         self.RATE = 16000
         self.SILENCE_THRESHOLD = 0.05
         self.SILENCE_DURATION = 0.5
+        # 장시간 실행 시 메모리 사용량을 제한하기 위한 버퍼 크기
+        self.QUEUE_SIZE = 100
+        self.DROP_REPORT_INTERVAL = 1.0  # 큐 항목 버림을 오류로 기록하는 최소 간격 (초)
+        self.ERROR_HISTORY_SIZE = 50
+        self.LATENCY_HISTORY_SIZE = 1000
 
-class SentenceManager:
+def current_rss_bytes():
+    """현재 프로세스의 RSS(상주 메모리) 크기를 바이트 단위로 반환합니다."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if sys.platform == 'darwin':
+        # macOS에는 /proc가 없으므로 ps로 현재 RSS(KB)를 조회
+        try:
+            output = subprocess.run(['ps', '-o', 'rss=', '-p', str(os.getpid())],
+                                    capture_output=True, text=True, timeout=2).stdout
+            return int(output.strip()) * 1024
+        except (OSError, ValueError, subprocess.SubprocessError):
+            pass
+    return None
+
+def max_rss_bytes():
+    """프로세스 시작 이후 최대 RSS 크기를 바이트 단위로 반환합니다. (줄어들지 않는 값)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # macOS는 바이트, 그 외는 KB 단위
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+def buffer_info(size, capacity, dropped=None):
+    """메모리 리포트에 사용할 버퍼 정보를 생성합니다."""
+    info = {'size': size, 'capacity': capacity}
+    if dropped is not None:
+        info['dropped'] = dropped
+    return info
+
+class PipelineStats:
     def __init__(self, config):
+        self.lock = threading.Lock()
+        self.errors = deque(maxlen=config.ERROR_HISTORY_SIZE)  # 최근 오류 히스토리
+        self.error_counts = {}  # 발생 위치별 누적 오류 수
+        self.latencies = deque(maxlen=config.LATENCY_HISTORY_SIZE)  # 최근 문장 처리 지연 시간
+        self.sentences = 0  # 전송 완료된 문장 수
+
+    def record_error(self, source, message):
+        """오류를 출력하고 제한된 크기의 히스토리에 기록합니다."""
+        print(message)
+        with self.lock:
+            self.errors.append((time.time(), source, message))
+            self.error_counts[source] = self.error_counts.get(source, 0) + 1
+
+    def record_latency(self, seconds):
+        """문장 하나의 인식부터 전송까지 걸린 시간을 기록합니다."""
+        with self.lock:
+            self.latencies.append(seconds)
+            self.sentences += 1
+
+    def latencies_since(self, count):
+        """전송 완료 문장 수가 count였던 이후의 지연 시간과 현재 문장 수를 함께 반환합니다."""
+        with self.lock:
+            new = self.sentences - count
+            window = list(self.latencies)[-new:] if new > 0 else []
+            return window, self.sentences
+
+    def snapshot(self):
+        """오류 및 지연 시간 통계를 반환합니다."""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            report = {
+                'sentences': self.sentences,
+                'errors': dict(self.error_counts),
+                'recent_errors': [
+                    {'time': t, 'source': source, 'message': message}
+                    for t, source, message in list(self.errors)[-5:]
+                ],
+                'buffers': {
+                    'error_history': buffer_info(len(self.errors), self.errors.maxlen),
+                    'latency_history': buffer_info(len(self.latencies), self.latencies.maxlen),
+                },
+            }
+        if latencies:
+            report['latency'] = {
+                'count': len(latencies),
+                'avg': sum(latencies) / len(latencies),
+                'p50': latencies[len(latencies) // 2],
+                'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                'max': latencies[-1],
+            }
+        return report
+
+class SentenceManager:
+    def __init__(self, config, stats=None):
+        self.stats = stats if stats is not None else PipelineStats(config)
         self.context = deque(maxlen=config.CONTEXT_SIZE)
-        self.correction_queue = queue.Queue(maxsize=100)
-        self.translation_queue = queue.Queue(maxsize=100)
+        self.correction_queue = queue.Queue(maxsize=config.QUEUE_SIZE)
+        self.translation_queue = queue.Queue(maxsize=config.QUEUE_SIZE)
+        self.dropped = {'correction_queue': 0, 'translation_queue': 0}  # 큐가 가득 차서 버려진 항목 수
+        self.drop_report_interval = config.DROP_REPORT_INTERVAL
+        self.last_drop_report = {'correction_queue': 0.0, 'translation_queue': 0.0}
         self.last_sentence_time = time.time()
         self.min_sentence_interval = 0.1
         self.accumulated_text = ""  # 누적된 텍스트 저장
@@ -52,6 +152,42 @@ class SentenceManager:
         
         # OpenAI API를 사용한 문장 완성 확인 (타임아웃 포함)
         return self.check_sentence_completion()
+
+    def put_bounded(self, name, item):
+        """큐가 가득 찬 경우 가장 오래된 항목을 버리고 새 항목을 추가합니다."""
+        q = getattr(self, name)
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    q.task_done()
+                except queue.Empty:
+                    continue
+                self._record_drop(name)
+
+    def _record_drop(self, name):
+        """버려진 항목 수를 세고, 일정 간격마다 누적 개수를 오류로 기록합니다."""
+        self.dropped[name] += 1
+        now = time.time()
+        if now - self.last_drop_report[name] >= self.drop_report_interval:
+            self.last_drop_report[name] = now
+            self.stats.record_error(name, f"{name}가 가득 차 가장 오래된 문장을 버렸습니다 (누적 {self.dropped[name]}개)")
+
+    def memory_report(self):
+        """문장 관리자가 보유한 버퍼의 크기를 반환합니다."""
+        return {
+            'context': buffer_info(len(self.context), self.context.maxlen),
+            'completed_sentences': buffer_info(len(self.completed_sentences), self.completed_sentences.maxlen),
+            # 최대 길이는 텍스트 추가 후에 확인되는 느슨한 제한이므로 용량과 구분
+            'accumulated_text': {'size': len(self.accumulated_text), 'soft_limit': self.max_accumulated_length},
+            'correction_queue': buffer_info(self.correction_queue.qsize(), self.correction_queue.maxsize,
+                                            self.dropped['correction_queue']),
+            'translation_queue': buffer_info(self.translation_queue.qsize(), self.translation_queue.maxsize,
+                                             self.dropped['translation_queue']),
+        }
         
     def check_sentence_completion_simple(self):
         """정규표현식 기반으로 문장 완성도를 더 정교하게 확인합니다."""
@@ -193,7 +329,7 @@ class SentenceManager:
             return False, ""
             
         except Exception as e:
-            print(f"OpenAI API 오류 또는 타임아웃: {str(e)}")
+            self.stats.record_error('openai', f"OpenAI API 오류 또는 타임아웃: {str(e)}")
             # API 실패 시 간단한 규칙 기반 방식으로 대체
             return self.check_sentence_completion_simple()
 
@@ -202,8 +338,9 @@ class TranscriptHandler(TranscriptResultStreamHandler):
         super().__init__(transcript_result_stream)
         self.translator = translator
         self.config = config
-        self.sentence_manager = SentenceManager(config)
-        self.partial_results = []  # 부분 결과 저장
+        self.sentence_manager = SentenceManager(config, translator.stats)
+        # 부분 결과는 현재 구간의 누적 텍스트이므로 가장 최근 것만 저장
+        self.partial_results = deque(maxlen=1)
         
     async def handle_transcript_event(self, transcript_event: TranscriptEvent):
         results = transcript_event.transcript.results
@@ -217,8 +354,9 @@ class TranscriptHandler(TranscriptResultStreamHandler):
                 text = transcript.alternatives[0].transcript
                 if text and self._is_valid_sentence(text):
                     print(f"인식된 텍스트: {text}")
-                    self.sentence_manager.correction_queue.put(text)
-                self.partial_results = []  # 부분 결과 초기화
+                    # 이벤트 루프가 막히지 않도록 대기 없이 큐에 추가
+                    self.sentence_manager.put_bounded('correction_queue', (text, time.time()))
+                self.partial_results.clear()  # 부분 결과 초기화
                 
     def _is_valid_sentence(self, text):
         # 문장 유효성 검사
@@ -229,19 +367,22 @@ class TranscriptHandler(TranscriptResultStreamHandler):
         return True
 
 class WebSocketClient:
-    def __init__(self, websocket_url):
+    def __init__(self, websocket_url, stats=None):
         self.websocket_url = websocket_url
         self.ws = None
         self.connected = False
         self.ws_thread = None
-        self.message_queue = queue.Queue()
+        self.stats = stats
 
     def connect(self):
         def on_message(ws, message):
             print(f"서버로부터 메시지 수신: {message}")
 
         def on_error(ws, error):
-            print(f"WebSocket 에러: {error}")
+            if self.stats is not None:
+                self.stats.record_error('websocket', f"WebSocket 에러: {error}")
+            else:
+                print(f"WebSocket 에러: {error}")
 
         def on_close(ws, close_status_code, close_msg):
             print(f"WebSocket 연결 종료: {close_status_code} - {close_msg}")
@@ -298,7 +439,7 @@ class VoiceTranslator:
         print(f"초기화 시작 시간: {time.strftime('%H:%M:%S')}")
         
         # 설정 로드
-        self.config = Config()
+        config = Config()
         print(f"설정 로드 완료: {time.time() - start_time:.2f}초")
         
         # 마이크 선택
@@ -307,7 +448,7 @@ class VoiceTranslator:
         
         # AWS 자격 증명 설정
         self.region = os.getenv('AWS_REGION', 'ap-northeast-2')
-        self.translate_client = boto3.client('translate',
+        translate_client = boto3.client('translate',
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
             region_name=self.region
@@ -322,10 +463,23 @@ class VoiceTranslator:
         websocket_url = os.getenv('WEBSOCKET_URL')
         if not websocket_url:
             raise ValueError("WEBSOCKET_URL 환경 변수가 설정되지 않았습니다.")
-        self.ws_client = WebSocketClient(websocket_url)
-        self.ws_client.connect()
+        ws_client = WebSocketClient(websocket_url)
+        ws_client.connect()
         print(f"WebSocket 연결 완료: {time.time() - start_time:.2f}초")
         
+        self.setup_pipeline(config, translate_client, ws_client)
+        
+        print(f"전체 초기화 완료: {time.time() - start_time:.2f}초")
+        
+    def setup_pipeline(self, config, translate_client, ws_client):
+        """번역 파이프라인의 설정, 클라이언트, 통계 및 스레드 상태를 초기화합니다."""
+        self.config = config
+        self.stats = PipelineStats(config)
+        self.translate_client = translate_client
+        self.ws_client = ws_client
+        self.ws_client.stats = self.stats
+        self.handler = None
+        
         # 스레드 제어
         self.running = True
         
@@ -334,7 +488,35 @@ class VoiceTranslator:
         self.translation_thread = None
         self.message_thread = None
         
-        print(f"전체 초기화 완료: {time.time() - start_time:.2f}초")
+    def start_pipeline(self, transcript_result_stream):
+        """트랜스크립트 핸들러를 생성하고 교정/번역 스레드를 시작합니다."""
+        self.handler = TranscriptHandler(self, transcript_result_stream, self.config)
+        
+        # 교정 스레드 시작
+        self.correction_thread = threading.Thread(
+            target=self.correction_worker,
+            args=(self.handler.sentence_manager,),
+            daemon=True
+        )
+        self.correction_thread.start()
+        
+        # 번역 스레드 시작
+        self.translation_thread = threading.Thread(
+            target=self.translation_worker,
+            args=(self.handler.sentence_manager,),
+            daemon=True
+        )
+        self.translation_thread.start()
+        return self.handler
+        
+    def stop_pipeline(self):
+        """스레드를 종료하고 WebSocket 연결을 닫습니다."""
+        self.running = False
+        if self.correction_thread and self.correction_thread.is_alive():
+            self.correction_thread.join(timeout=1)
+        if self.translation_thread and self.translation_thread.is_alive():
+            self.translation_thread.join(timeout=1)
+        self.ws_client.close()
         
     def select_microphone(self):
         """사용 가능한 마이크를 나열하고 사용자가 선택하도록 합니다."""
@@ -389,22 +571,32 @@ class VoiceTranslator:
             )
             return response['TranslatedText']
         except Exception as e:
-            print(f"번역 오류: {str(e)}")
+            self.stats.record_error('translate', f"번역 오류: {str(e)}")
             return ""
+
+    def memory_report(self):
+        """파이프라인의 모든 버퍼 크기와 오류, 지연 시간 통계를 반환합니다."""
+        report = self.stats.snapshot()
+        report['rss_bytes'] = current_rss_bytes()
+        report['max_rss_bytes'] = max_rss_bytes()
+        if self.handler is not None:
+            partial_results = self.handler.partial_results
+            report['buffers']['partial_results'] = buffer_info(len(partial_results), partial_results.maxlen)
+            report['buffers']['partial_results']['chars'] = sum(len(text) for text in list(partial_results))
+            report['buffers'].update(self.handler.sentence_manager.memory_report())
+            report['dropped'] = dict(self.handler.sentence_manager.dropped)
+        return report
+
+    def print_memory_report(self):
+        """메모리 리포트를 출력합니다. (SIGUSR1 시그널로 실행 중 호출 가능)"""
+        print(f"메모리 리포트: {json.dumps(self.memory_report(), ensure_ascii=False)}")
     
     def correction_worker(self, sentence_manager):
         """AI 교정 작업을 처리하는 워커 스레드"""
         while self.running:
             try:
                 # 큐에서 텍스트 가져오기 (0.5초 타임아웃으로 단축)
-                text = sentence_manager.correction_queue.get(timeout=0.5)
-                # 문장 완성도 확인
-                is_complete, complete_sentence = sentence_manager.add_text(text)
-                if is_complete and complete_sentence:
-                    print(f"완성된 문장: {complete_sentence}")
-                    # 번역을 위한 텍스트를 큐에 추가
-                    sentence_manager.translation_queue.put(complete_sentence)
-                sentence_manager.correction_queue.task_done()
+                text, received_at = sentence_manager.correction_queue.get(timeout=0.5)
             except queue.Empty:
                 # 큐가 비어있을 때 대기 중인 텍스트 확인
                 if sentence_manager.accumulated_text and \
@@ -413,30 +605,40 @@ class VoiceTranslator:
                     is_complete, complete_sentence = sentence_manager.check_sentence_completion_simple()
                     if is_complete and complete_sentence:
                         print(f"타임아웃으로 완성된 문장: {complete_sentence}")
-                        sentence_manager.translation_queue.put(complete_sentence)
+                        sentence_manager.put_bounded('translation_queue',
+                                                     (complete_sentence, sentence_manager.last_text_time))
                 continue
+            try:
+                # 문장 완성도 확인
+                is_complete, complete_sentence = sentence_manager.add_text(text)
+                if is_complete and complete_sentence:
+                    print(f"완성된 문장: {complete_sentence}")
+                    # 번역을 위한 텍스트를 큐에 추가
+                    sentence_manager.put_bounded('translation_queue', (complete_sentence, received_at))
             except Exception as e:
-                print(f"교정 스레드 오류: {str(e)}")
-                continue
+                self.stats.record_error('correction', f"교정 스레드 오류: {str(e)}")
+            finally:
+                sentence_manager.correction_queue.task_done()
     
     def translation_worker(self, sentence_manager):
         """번역 작업을 처리하는 워커 스레드"""
         while self.running:
             try:
                 # 큐에서 텍스트 가져오기 (1초 타임아웃)
-                text = sentence_manager.translation_queue.get(timeout=1)
+                text, received_at = sentence_manager.translation_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
                 translated_text = self.translate_text(text)
                 print(f"번역된 텍스트: {translated_text}")
                 
                 # WebSocket으로 메시지 전송
                 self.ws_client.send_message("VoiceTranslator", text, translated_text)
-                
-                sentence_manager.translation_queue.task_done()
-            except queue.Empty:
-                continue
+                self.stats.record_latency(time.time() - received_at)
             except Exception as e:
-                print(f"번역 스레드 오류: {str(e)}")
-                continue
+                self.stats.record_error('translation', f"번역 스레드 오류: {str(e)}")
+            finally:
+                sentence_manager.translation_queue.task_done()
     
     async def mic_stream(self):
         """마이크에서 오디오를 스트리밍합니다."""
@@ -488,24 +690,12 @@ class VoiceTranslator:
                 partial_results_stability="high",  # 높은 안정성 설정
             )
             
-            # 핸들러 생성 및 연결
-            handler = TranscriptHandler(self, stream.output_stream, self.config)
+            # 핸들러 생성 및 교정/번역 스레드 시작
+            handler = self.start_pipeline(stream.output_stream)
             
-            # 교정 스레드 시작
-            self.correction_thread = threading.Thread(
-                target=self.correction_worker,
-                args=(handler.sentence_manager,),
-                daemon=True
-            )
-            self.correction_thread.start()
-            
-            # 번역 스레드 시작
-            self.translation_thread = threading.Thread(
-                target=self.translation_worker,
-                args=(handler.sentence_manager,),
-                daemon=True
-            )
-            self.translation_thread.start()
+            # 실행 중 SIGUSR1 시그널로 메모리 리포트 조회
+            if hasattr(signal, 'SIGUSR1'):
+                asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.print_memory_report)
             
             # 핸들러 연결
             await asyncio.gather(
@@ -514,16 +704,11 @@ class VoiceTranslator:
             )
             
         except Exception as e:
-            print(f"오류 발생: {str(e)}")
+            self.stats.record_error('pipeline', f"오류 발생: {str(e)}")
             self.running = False
         finally:
             # 프로그램 종료 시 정리
-            self.running = False
-            if self.correction_thread and self.correction_thread.is_alive():
-                self.correction_thread.join(timeout=1)
-            if self.translation_thread and self.translation_thread.is_alive():
-                self.translation_thread.join(timeout=1)
-            self.ws_client.close()
+            self.stop_pipeline()
 
 async def main():
     translator = VoiceTranslator()